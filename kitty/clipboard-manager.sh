@@ -5,12 +5,17 @@
 # Enhanced clipboard operations and visual feedback
 #
 # HARDENED v2.1: Improved error handling and utility detection
+# History: entries are recorded by `record` (bound to the copy keys) and
+# browsed with fuzzy search via the shortcuts kitten (`history`).
 
 # Strict error handling (allow manual handling for missing clipboard tools)
 set -uo pipefail
 
 ACTION="${1:-menu}"
 
+KITTY_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+HISTORY_KITTEN="${KITTY_DIR}/kittens/shortcuts_menu"
+
 # Colors for feedback
 GREEN='\033[0;32m'
 CYAN='\033[0;36m'
@@ -19,6 +24,13 @@ NC='\033[0m' # No Color
 
 # --- Clipboard Utility Functions ---
 
+history_available() {
+    if ! command -v python3 >/dev/null 2>&1; then
+        echo -e "${RED}❌ Error: python3 is required for clipboard history${NC}"
+        return 1
+    fi
+}
+
 clipboard_missing() {
     echo -e "${RED}❌ Error: No clipboard utility found (install wl-clipboard or xclip)${NC}"
     read -r -p "Press Enter to continue..." _
@@ -47,6 +59,26 @@ get_primary() {
     fi
 }
 
+# Password managers tag secrets with this MIME type; never persist those
+PASSWORD_HINT="x-kde-passwordManagerHint"
+
+# Append the current clipboard (text only) to the history store (deduplicated)
+record_clipboard() {
+    if command -v wl-paste >/dev/null 2>&1; then
+        if wl-paste --list-types 2>/dev/null | grep -qxF "$PASSWORD_HINT"; then
+            return 0
+        fi
+        wl-paste --type text --no-newline 2>/dev/null | python3 "${HISTORY_KITTEN}/clipboard_history.py" add
+    elif command -v xclip >/dev/null 2>&1; then
+        if xclip -o -selection clipboard -t TARGETS 2>/dev/null | grep -qxF "$PASSWORD_HINT"; then
+            return 0
+        fi
+        xclip -o -selection clipboard -t UTF8_STRING 2>/dev/null | python3 "${HISTORY_KITTEN}/clipboard_history.py" add
+    else
+        return 1
+    fi
+}
+
 case "$ACTION" in
     show)
         # Show current clipboard content
@@ -73,10 +105,36 @@ case "$ACTION" in
         fi
         CHARS=${#CONTENT}
         LINES=$(printf '%s\n' "$CONTENT" | wc -l)
+        if history_available >/dev/null; then
+            record_clipboard >/dev/null 2>&1 || true
+        fi
         echo -e "${GREEN}✓ Copied ${CHARS} characters (${LINES} lines)${NC}"
         sleep 1
         ;;
 
+    record)
+        # Silent: meant for `launch --type=background` after a copy
+        history_available >/dev/null || exit 0
+        record_clipboard >/dev/null 2>&1 || true
+        ;;
+
+    history)
+        # Fuzzy-searchable clipboard history (shortcuts kitten palette)
+        if ! history_available; then
+            read -r -p "Press Enter to continue..." _
+            exit 0
+        fi
+        record_clipboard >/dev/null 2>&1 || true
+        python3 "${HISTORY_KITTEN}/main.py" --history
+        ;;
+
+    clear-history)
+        history_available || exit 0
+        python3 "${HISTORY_KITTEN}/clipboard_history.py" clear
+        echo -e "${GREEN}✓ Clipboard history cleared${NC}"
+        sleep 1
+        ;;
+
     clear)
         # Clear clipboard
         if command -v wl-copy >/dev/null 2>&1; then
@@ -118,6 +176,12 @@ case "$ACTION" in
             echo "Primary Selection: empty"
         fi
 
+        if history_available >/dev/null; then
+            echo ""
+            echo -e "${GREEN}History:${NC}"
+            python3 "${HISTORY_KITTEN}/clipboard_history.py" stats | sed 's/^/  /'
+        fi
+
         echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         read -r -p "Press Enter to continue..."
         ;;
@@ -127,22 +191,26 @@ case "$ACTION" in
         echo -e "${CYAN}📋 Clipboard Manager${NC}"
         echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         echo "1. Show clipboard content"
-        echo "2. Show statistics"
-        echo "3. Clear clipboard"
-        echo "4. Exit"
+        echo "2. Browse history (fuzzy search)"
+        echo "3. Show statistics"
+        echo "4. Clear clipboard"
+        echo "5. Clear history"
+        echo "6. Exit"
         echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         read -r -p "Select option: " choice
 
         case "$choice" in
             1) $0 show ;;
-            2) $0 stats ;;
-            3) $0 clear ;;
+            2) $0 history ;;
+            3) $0 stats ;;
+            4) $0 clear ;;
+            5) $0 clear-history ;;
             *) exit 0 ;;
         esac
         ;;
 
     *)
-        echo "Usage: clipboard-manager.sh [show|stats|clear|copy-notify|menu]"
+        echo "Usage: clipboard-manager.sh [show|history|record|stats|clear|clear-history|copy-notify|menu]"
         exit 1
         ;;
 esac
@@ -0,0 +1,548 @@
+"""Bounded clipboard history with fuzzy recall for the shortcuts palette.
+
+Entries live in an append-only log inside a memory-mapped file so every
+process (the recorder launched on copy, the palette overlay) shares one
+history without re-reading it. Content is keyed by hash: copying the same
+text twice only appends a small "touch" record that bumps its recency.
+The in-memory view is an LRU capped by entry count and payload bytes. The
+search index keeps casefolded entry heads in recency order, and queries
+that extend the previous one only re-check its survivors, so typing in the
+palette narrows results instead of rescanning the whole history.
+
+Usage (CLI):
+    clipboard_history.py add < text      # record stdin as newest entry
+    clipboard_history.py search [QUERY]  # print matches, newest first
+    clipboard_history.py stats
+    clipboard_history.py clear
+
+Environment:
+    KITTY_CLIPBOARD_HISTORY_FILE         (default: $XDG_STATE_HOME/kitty/clipboard-history.bin)
+    KITTY_CLIPBOARD_HISTORY_MAX_ENTRIES  (default: 1000)
+    KITTY_CLIPBOARD_HISTORY_MAX_BYTES    (default: 8 MiB)
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import heapq
+import mmap
+import operator
+import os
+import re
+import struct
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+# Only the head of each entry is indexed (about what the palette row shows),
+# which keeps recall under 10 ms with thousands of multi-KB entries.
+INDEX_CHARS = 128
+PREVIEW_CHARS = 200
+
+_MAGIC = b"KCLH"
+_VERSION = 1
+# magic, version, generation (bumped on clear), end-of-log offset
+_HEADER = struct.Struct("<4sIQQ")
+# kind, payload length, blake2b digest, unix timestamp
+_RECORD = struct.Struct("<BxxxI20sd")
+_DIGEST_SIZE = 20
+
+_KIND_ENTRY = 1
+_KIND_TOUCH = 2
+# Removed or evicted record: payload and digest zeroed in place, skipped on replay.
+_KIND_ERASED = 4
+
+# Control characters would corrupt (or, for NUL, crash) curses rendering.
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
+
+@dataclass
+class Entry:
+    """A single history item; the payload stays in the mapped file."""
+
+    digest: bytes
+    offset: int
+    length: int
+    timestamp: float
+    key: str
+    preview: str
+
+
+def default_path() -> str:
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.environ.get(
+        "KITTY_CLIPBOARD_HISTORY_FILE",
+        os.path.join(state_home, "kitty", "clipboard-history.bin"),
+    )
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.environ.get(name, ""))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+# Possessive quantifiers (3.11+) make the subsequence scan strictly linear.
+_STAR = "*+" if sys.version_info >= (3, 11) else "*"
+
+
+def _term_pattern(term: str) -> "re.Pattern[str]":
+    """Compile ``term`` into an anchored in-order subsequence matcher.
+
+    Each character is found at its first occurrence after the previous one;
+    group 1 spans the matched characters so the gaps can be scored.
+    """
+    parts = [f"[^{re.escape(term[0])}]{_STAR}("]
+    for prev, char in zip(term, term[1:]):
+        parts.append(f"{re.escape(prev)}[^{re.escape(char)}]{_STAR}")
+    parts.append(f"{re.escape(term[-1])})")
+    return re.compile("".join(parts), re.DOTALL)
+
+
+class ClipboardHistory:
+    """Deduplicated, size-bounded clipboard history backed by ``mmap``."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Compaction keeps live data under half of this, so appends amortise.
+        self.capacity = _HEADER.size + 2 * (max_bytes + max_entries * _RECORD.size)
+
+        self._entries: "OrderedDict[bytes, Entry]" = OrderedDict()
+        self._total_bytes = 0
+        # Search index: entries newest-first, rebuilt lazily after changes.
+        self._ranked: Optional[List[Entry]] = None
+        self._keys: List[str] = []
+        self._last_query = ""
+        self._last_hits: List[int] = []
+        self._fd = -1
+        self._mm: Optional[mmap.mmap] = None
+        self._inode = 0
+        self._generation = 0
+        self._end = _HEADER.size
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            self._open()
+
+    @classmethod
+    def from_env(cls) -> "ClipboardHistory":
+        return cls(
+            default_path(),
+            max_entries=_env_int("KITTY_CLIPBOARD_HISTORY_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+            max_bytes=_env_int("KITTY_CLIPBOARD_HISTORY_MAX_BYTES", DEFAULT_MAX_BYTES),
+        )
+
+    # --- Public API ---
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "ClipboardHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def close(self) -> None:
+        self._unmap()
+        if self._lock_fd >= 0:
+            os.close(self._lock_fd)
+            self._lock_fd = -1
+
+    def add(self, data: bytes, timestamp: Optional[float] = None) -> bool:
+        """Record ``data`` as the newest entry; returns False if it was skipped."""
+        if not data.strip() or len(data) > self.max_bytes or b"\x00" in data:
+            return False
+        try:
+            data.decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+        timestamp = time.time() if timestamp is None else timestamp
+        digest = _digest(data)
+        with self._locked():
+            self._sync()
+            if digest in self._entries:
+                self._append(_KIND_TOUCH, digest, timestamp)
+                self._touch(digest, timestamp)
+            else:
+                offset = self._append(_KIND_ENTRY, digest, timestamp, data)
+                self._insert(digest, offset, len(data), timestamp)
+                for evicted in self._evict():
+                    self._erase(evicted)
+        return True
+
+    def recall(self, entry: Entry) -> Optional[str]:
+        """Return an entry's text and mark it as most recently used.
+
+        Returns None if the entry was removed or evicted (possibly by
+        another process) since it was looked up.
+        """
+        with self._locked():
+            self._sync()
+            live = self._entries.get(entry.digest)
+            if live is None:
+                return None
+            assert self._mm is not None
+            kind, _, digest, _ = _RECORD.unpack_from(self._mm, live.offset - _RECORD.size)
+            if kind != _KIND_ENTRY or digest != live.digest:
+                # Erased by a writer with tighter limits than ours.
+                self._discard(live.digest)
+                return None
+            text = self._mm[live.offset:live.offset + live.length].decode("utf-8", "replace")
+            now = time.time()
+            self._append(_KIND_TOUCH, live.digest, now)
+            self._touch(live.digest, now)
+        return text
+
+    def remove(self, entry: Entry) -> None:
+        """Drop an entry and wipe its payload and digest from the log."""
+        with self._locked():
+            self._sync()
+            live = self._entries.get(entry.digest)
+            if live is None:
+                return
+            self._erase(live)
+            self._erase_touches(live.digest)
+            self._discard(live.digest)
+            # Other processes reload from scratch and skip the erased record.
+            self._write_header(self._generation + 1, self._end)
+
+    def clear(self) -> None:
+        """Drop every entry and zero the used part of the log."""
+        with self._locked():
+            self._sync()
+            assert self._mm is not None
+            end = self._end
+            self._write_header(self._generation + 1, _HEADER.size)
+            self._mm[_HEADER.size:end] = bytes(end - _HEADER.size)
+            self._reset_index()
+
+    def search(self, query: str = "", limit: int = 200) -> List[Entry]:
+        """Return entries matching ``query`` best-first; newest first when empty.
+
+        Each whitespace-separated term must match as a substring or an
+        in-order subsequence. Ties are broken by recency.
+        """
+        with self._locked():
+            self._sync()
+        query = query.casefold()
+        terms = query.split()
+        if not terms:
+            newest = reversed(self._entries.values())
+            return [entry for _, entry in zip(range(limit), newest)]
+
+        ranked = self._build_index()
+        keys = self._keys
+        if self._last_query and query.startswith(self._last_query):
+            # Anything matching the longer query matched the shorter one too.
+            candidates = self._last_hits
+        else:
+            candidates = list(range(len(ranked)))
+
+        # Each term is matched across all candidates via map() so the
+        # per-entry work stays in C; Python only touches the survivors.
+        scores = [0] * len(candidates)
+        for term in terms:
+            subset = [keys[index] for index in candidates]
+            matches = map(_term_pattern(term).match, subset)
+            exact = map(operator.contains, subset, repeat(term))
+            kept: List[int] = []
+            kept_scores: List[int] = []
+            for index, score, match, is_exact in zip(candidates, scores, matches, exact):
+                if match is None:
+                    continue
+                kept.append(index)
+                if not is_exact:
+                    # Skipped characters between the matched ones.
+                    score += match.end(1) - match.start(1) - len(term)
+                kept_scores.append(score)
+            candidates, scores = kept, kept_scores
+
+        self._last_query = query
+        self._last_hits = candidates
+        # Ranked order is newest-first, so the index breaks ties by recency.
+        best = heapq.nsmallest(limit, zip(scores, candidates))
+        return [ranked[index] for _, index in best]
+
+    # --- In-memory index ---
+
+    def _build_index(self) -> List[Entry]:
+        if self._ranked is None:
+            self._ranked = list(reversed(self._entries.values()))
+            self._keys = [entry.key for entry in self._ranked]
+            self._last_query = ""
+        return self._ranked
+
+    def _reset_index(self) -> None:
+        self._entries.clear()
+        self._ranked = None
+        self._total_bytes = 0
+
+    def _insert(self, digest: bytes, offset: int, length: int, timestamp: float) -> None:
+        if digest in self._entries:
+            self._discard(digest)
+        assert self._mm is not None
+        text = self._mm[offset:offset + min(length, INDEX_CHARS * 4)].decode("utf-8", "replace")
+        key = text[:INDEX_CHARS].casefold()
+        preview = " ".join(_CONTROL_CHARS.sub(" ", text[:PREVIEW_CHARS]).split())
+
+        entry = Entry(digest, offset, length, timestamp, key, preview)
+        self._entries[digest] = entry
+        self._ranked = None
+        self._total_bytes += length
+
+    def _discard(self, digest: bytes) -> None:
+        entry = self._entries.pop(digest)
+        self._ranked = None
+        self._total_bytes -= entry.length
+
+    def _touch(self, digest: bytes, timestamp: float) -> None:
+        self._entries[digest].timestamp = timestamp
+        self._entries.move_to_end(digest)
+        self._ranked = None
+
+    def _evict(self) -> List[Entry]:
+        evicted: List[Entry] = []
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries.values()))
+            self._discard(oldest.digest)
+            evicted.append(oldest)
+        return evicted
+
+    # --- Mapped log ---
+
+    def _locked(self):
+        return _FileLock(self._lock_fd)
+
+    def _open(self) -> None:
+        self._unmap()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            size = os.fstat(fd).st_size
+            fresh = size < _HEADER.size
+            if size < self.capacity:
+                os.ftruncate(fd, self.capacity)
+                size = self.capacity
+            mm = mmap.mmap(fd, size)
+        except OSError:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self._mm = mm
+        self._inode = os.fstat(fd).st_ino
+        magic, version, generation, end = _HEADER.unpack_from(mm, 0)
+        if fresh or magic != _MAGIC or version != _VERSION or not _HEADER.size <= end <= size:
+            self._write_header(generation + 1, _HEADER.size)
+        else:
+            self._generation = generation
+        self._reset_index()
+        self._end = _HEADER.size
+        self._replay()
+
+    def _unmap(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _sync(self) -> None:
+        """Pick up records written by other processes since our last look."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = -1
+        assert self._mm is not None
+        if inode != self._inode:
+            self._open()
+            return
+        _, _, generation, end = _HEADER.unpack_from(self._mm, 0)
+        if generation != self._generation or end < self._end or end > len(self._mm):
+            self._open()
+        elif end > self._end:
+            self._replay()
+
+    def _replay(self) -> None:
+        assert self._mm is not None
+        mm = self._mm
+        end = _HEADER.unpack_from(mm, 0)[3]
+        pos = self._end
+        while pos + _RECORD.size <= end:
+            kind, length, digest, timestamp = _RECORD.unpack_from(mm, pos)
+            payload = pos + _RECORD.size
+            if payload + length > end or kind not in (_KIND_ENTRY, _KIND_TOUCH, _KIND_ERASED):
+                break
+            if kind == _KIND_ENTRY:
+                self._insert(digest, payload, length, timestamp)
+                self._evict()
+            elif kind == _KIND_TOUCH and digest in self._entries:
+                self._touch(digest, timestamp)
+            pos = payload + length
+        if pos != end:
+            # Torn or corrupt tail: drop it so later appends stay readable.
+            self._write_header(self._generation, pos)
+        self._end = pos
+
+    def _write_header(self, generation: int, end: int) -> None:
+        assert self._mm is not None
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, generation, end)
+        self._generation = generation
+        self._end = end
+
+    def _append(self, kind: int, digest: bytes, timestamp: float, data: bytes = b"") -> int:
+        """Append a record and return the offset of its payload."""
+        assert self._mm is not None
+        needed = _RECORD.size + len(data)
+        if self._end + needed > len(self._mm):
+            self._compact()
+        assert self._mm is not None
+        pos = self._end
+        _RECORD.pack_into(self._mm, pos, kind, len(data), digest, timestamp)
+        payload = pos + _RECORD.size
+        self._mm[payload:payload + len(data)] = data
+        # Publish the record only once it is fully written.
+        self._write_header(self._generation, payload + len(data))
+        return payload
+
+    def _erase(self, entry: Entry) -> None:
+        """Zero an entry's payload and digest in the log, keeping its length."""
+        assert self._mm is not None
+        record = entry.offset - _RECORD.size
+        _RECORD.pack_into(self._mm, record, _KIND_ERASED, entry.length, bytes(_DIGEST_SIZE), 0.0)
+        self._mm[entry.offset:entry.offset + entry.length] = bytes(entry.length)
+
+    def _erase_touches(self, digest: bytes) -> None:
+        """Zero the digest in every touch record that refers to ``digest``."""
+        assert self._mm is not None
+        pos = _HEADER.size
+        while pos + _RECORD.size <= self._end:
+            kind, length, record_digest, _ = _RECORD.unpack_from(self._mm, pos)
+            if kind == _KIND_TOUCH and record_digest == digest:
+                _RECORD.pack_into(self._mm, pos, _KIND_ERASED, 0, bytes(_DIGEST_SIZE), 0.0)
+            pos += _RECORD.size + length
+
+    def _compact(self) -> None:
+        """Rewrite live entries into a fresh file and swap it in atomically."""
+        assert self._mm is not None
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        offsets: List[Tuple[Entry, int]] = []
+        try:
+            os.ftruncate(fd, self.capacity)
+            with mmap.mmap(fd, self.capacity) as new_mm:
+                pos = _HEADER.size
+                for entry in self._entries.values():
+                    _RECORD.pack_into(
+                        new_mm, pos, _KIND_ENTRY, entry.length, entry.digest, entry.timestamp
+                    )
+                    payload = pos + _RECORD.size
+                    new_mm[payload:payload + entry.length] = (
+                        self._mm[entry.offset:entry.offset + entry.length]
+                    )
+                    offsets.append((entry, payload))
+                    pos = payload + entry.length
+                _HEADER.pack_into(new_mm, 0, _MAGIC, _VERSION, self._generation, pos)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            os.close(fd)
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        # Wipe the replaced log so dropped entries don't linger in its blocks.
+        self._mm[_HEADER.size:self._end] = bytes(self._end - _HEADER.size)
+        self._unmap()
+        self._fd = fd
+        self._mm = mmap.mmap(fd, self.capacity)
+        self._inode = os.fstat(fd).st_ino
+        for entry, payload in offsets:
+            entry.offset = payload
+        self._end = pos
+
+
+class _FileLock:
+    """Exclusive ``flock`` held for the duration of a ``with`` block."""
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def format_age(timestamp: float, now: Optional[float] = None) -> str:
+    seconds = max(0, int((time.time() if now is None else now) - timestamp))
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit} ago"
+    return f"{seconds}s ago"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Kitty clipboard history store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("add", help="record stdin as the newest entry")
+    search = sub.add_parser("search", help="list entries matching a fuzzy query")
+    search.add_argument("query", nargs="*")
+    search.add_argument("-n", "--limit", type=int, default=20)
+    sub.add_parser("stats", help="show entry count and storage usage")
+    sub.add_parser("clear", help="drop every entry")
+    args = parser.parse_args(argv)
+
+    if args.command != "add" and not os.path.exists(default_path()):
+        # Nothing recorded yet: don't create the (sparse, preallocated) log.
+        if args.command == "stats":
+            print("Entries: 0 (history is empty)")
+        return 0
+
+    with ClipboardHistory.from_env() as history:
+        if args.command == "add":
+            return 0 if history.add(sys.stdin.buffer.read()) else 1
+        if args.command == "search":
+            for entry in history.search(" ".join(args.query), limit=args.limit):
+                print(f"{format_age(entry.timestamp):>8}  {entry.preview}")
+        elif args.command == "stats":
+            print(f"Entries: {len(history)} / {history.max_entries}")
+            print(f"Bytes:   {history.total_bytes} / {history.max_bytes}")
+            print(f"File:    {history.path}")
+        elif args.command == "clear":
+            history.clear()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,19 @@
-"""Kitty kitten that shows an interactive shortcut palette."""
+"""Kitty kitten that shows an interactive shortcut palette.
+
+Pass ``--history`` to browse the clipboard history instead (see
+``clipboard_history.py``).
+"""
 
 from __future__ import annotations
 
 import curses
 import subprocess
 import sys
+import time
 from typing import Iterable, List, Sequence, Tuple
 
+from clipboard_history import ClipboardHistory, Entry, format_age
+
 
 Shortcut = Tuple[str, str]
 
@@ -241,6 +248,34 @@ MODE DESCRIPTIONS:
 
 Launches ai-mode-start.sh with selected mode automatically!""",
 
+    "Ctrl+Shift+Alt+Y": """Clipboard History
+
+Fuzzy recall of text copied with Ctrl+Shift+C (or recorded via
+clipboard-manager.sh record).
+
+LIMITATIONS:
+Copy-on-select and Ctrl+Shift+Alt+C have no recording hook. Those
+copies are only recorded when this history is opened while they are
+still on the clipboard. Only text is stored; password-manager copies
+are skipped.
+
+FEATURES:
+• Deduplicated - copying the same text again just bumps it to the top
+• Bounded - oldest entries are evicted past the entry/size limits
+• Persistent - stored in ~/.local/state/kitty/clipboard-history.bin
+
+NAVIGATION:
+• Type to search (substring or in-order fuzzy match)
+• Arrow keys / Page Up/Down to navigate
+• Enter - copy selected entry back to the clipboard
+• Delete - remove selected entry from history
+• Esc - clear filter, then exit
+
+LIMITS (environment):
+• KITTY_CLIPBOARD_HISTORY_MAX_ENTRIES (default 1000)
+• KITTY_CLIPBOARD_HISTORY_MAX_BYTES (default 8 MiB)
+• KITTY_CLIPBOARD_HISTORY_FILE (storage path override)""",
+
     "Ctrl+Alt+Shift+X": """Dual AI Agents Tmux Session
 
 Creates a specialized tmux layout for running two AI agents with
@@ -345,6 +380,7 @@ SHORTCUT_SECTIONS: Sequence[Tuple[str, Sequence[Shortcut]]] = (
             ("Ctrl+Shift+Alt+C", "Copy and clear / send interrupt"),
             ("Ctrl+Shift+P", "Paste without newlines"),
             ("Ctrl+Shift+Alt+P", "Clipboard manager overlay"),
+            ("Ctrl+Shift+Alt+Y", "Clipboard history (fuzzy recall)"),
         ),
     ),
     (
@@ -409,6 +445,34 @@ def flattened_entries(query: str) -> Tuple[List[Tuple[str, str, str]], List[int]
     return entries, item_positions
 
 
+def history_entries(
+    history: ClipboardHistory, query: str
+) -> Tuple[List[Tuple[str, str, str]], List[int], List[Entry], float]:
+    """Return (entries, item_indices, matches, elapsed_ms) for the history view.
+
+    matches is parallel to item_indices and holds the recalled history items.
+    """
+
+    started = time.perf_counter()
+    matches = history.search(query)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    now = time.time()
+    entries: List[Tuple[str, str, str]] = [
+        ("category", f"Clipboard History ({len(matches)} of {len(history)})", "")
+    ]
+    item_positions: List[int] = []
+    for match in matches:
+        entries.append(("item", format_age(match.timestamp, now), match.preview))
+        item_positions.append(len(entries) - 1)
+
+    if not matches:
+        empty = "No matching entries" if query else "Clipboard history is empty"
+        entries.append(("empty", empty, ""))
+
+    return entries, item_positions, matches, elapsed_ms
+
+
 def copy_to_clipboard(text: str) -> bool:
     """Copy text to system clipboard using available tools."""
     try:
@@ -493,6 +557,9 @@ def draw_menu(
     selection_idx: int,
     query: str,
     top: int,
+    title: str = " Kitty Shortcut Palette ",
+    footer: str = "↑/↓ Navigate  •  c Copy  •  ? Help  •  Enter/Esc Exit",
+    status: str = "",
 ) -> int:
     stdscr.erase()
     stdscr.nodelay(False)
@@ -506,10 +573,11 @@ def draw_menu(
 
     window = stdscr.derwin(box_height, box_width, offset_y, offset_x)
     window.box()
-    title = " Kitty Shortcut Palette "
     window.addstr(0, max(1, (box_width - len(title)) // 2), title, curses.A_BOLD)
 
     filter_line = f"Filter: {query}" if query else "Filter: (type to search)"
+    if status:
+        filter_line = f"{filter_line}  [{status}]"
     window.addstr(1, 2, filter_line[: box_width - 4], curses.A_DIM)
     window.hline(2, 1, curses.ACS_HLINE, box_width - 2)
 
@@ -540,20 +608,34 @@ def draw_menu(
         window.addstr(text_y, 2, line[: box_width - 4], attr)
 
     window.hline(box_height - 2, 1, curses.ACS_HLINE, box_width - 2)
-    footer = "↑/↓ Navigate  •  c Copy  •  ? Help  •  Enter/Esc Exit"
     window.addstr(box_height - 2, max(1, (box_width - len(footer)) // 2), footer[: box_width - 2], curses.A_DIM)
 
     stdscr.refresh()
     return viewport_height
 
 
-def run_palette(stdscr) -> None:
+def init_colors() -> None:
     curses.curs_set(0)
     curses.start_color()
     curses.use_default_colors()
     curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_CYAN)
     curses.init_pair(2, curses.COLOR_CYAN, -1)
 
+
+def flash_message(stdscr, msg: str) -> None:
+    try:
+        height, width = stdscr.getmaxyx()
+        stdscr.addstr(height - 1, max(0, (width - len(msg)) // 2),
+                    msg, curses.A_BOLD | curses.color_pair(2))
+        stdscr.refresh()
+        curses.napms(800)  # 0.8 second flash
+    except curses.error:
+        pass
+
+
+def run_palette(stdscr) -> None:
+    init_colors()
+
     query = ""
     entries, item_positions = flattened_entries(query)
     selection_idx = 0
@@ -601,15 +683,7 @@ def run_palette(stdscr) -> None:
                 if kind == "item":
                     if copy_to_clipboard(combo):
                         # Flash success message
-                        try:
-                            height, width = stdscr.getmaxyx()
-                            msg = "✓ Copied to clipboard!"
-                            stdscr.addstr(height - 1, max(0, (width - len(msg)) // 2),
-                                        msg, curses.A_BOLD | curses.color_pair(2))
-                            stdscr.refresh()
-                            curses.napms(800)  # 0.8 second flash
-                        except curses.error:
-                            pass
+                        flash_message(stdscr, "✓ Copied to clipboard!")
                 continue
 
             # Show extended help
@@ -656,10 +730,110 @@ def run_palette(stdscr) -> None:
                 continue
 
 
+def run_history_palette(stdscr, history: ClipboardHistory) -> None:
+    init_colors()
+
+    query = ""
+    entries, item_positions, matches, elapsed_ms = history_entries(history, query)
+    selection_idx = 0
+    top = 0
+
+    def refresh(new_query: str) -> None:
+        nonlocal query, entries, item_positions, matches, elapsed_ms, selection_idx, top
+        query = new_query
+        entries, item_positions, matches, elapsed_ms = history_entries(history, query)
+        selection_idx = 0
+        top = 0
+
+    while True:
+        if item_positions:
+            selection_idx = max(0, min(selection_idx, len(item_positions) - 1))
+            selected_line = item_positions[selection_idx]
+        else:
+            selected_line = 0
+
+        viewport_height = draw_menu(
+            stdscr,
+            entries,
+            item_positions,
+            selection_idx,
+            query,
+            top,
+            title=" Clipboard History ",
+            footer="↑/↓ Navigate  •  Enter Copy  •  Del Remove  •  Esc Exit",
+            status=f"{elapsed_ms:.1f} ms",
+        )
+        if selected_line < top:
+            top = selected_line
+        elif selected_line >= top + viewport_height:
+            top = selected_line - viewport_height + 1
+
+        key = stdscr.get_wch()
+
+        if isinstance(key, str):
+            if key in ("\n", "\r"):
+                if matches:
+                    text = history.recall(matches[selection_idx])
+                    if text is None:
+                        # Removed or evicted by another process meanwhile
+                        flash_message(stdscr, "✗ Entry no longer in history")
+                        refresh(query)
+                        continue
+                    if copy_to_clipboard(text):
+                        flash_message(stdscr, "✓ Copied to clipboard!")
+                break
+            if key in ("\x1b", "\u001b"):
+                if query:
+                    refresh("")
+                    continue
+                break
+            if key in ("\x7f", "\b"):
+                refresh(query[:-1])
+                continue
+            if key.isprintable():
+                refresh(query + key)
+                continue
+        else:  # numeric keys (curses key codes)
+            if key in (curses.KEY_UP,):
+                if item_positions:
+                    selection_idx = (selection_idx - 1) % len(item_positions)
+                continue
+            if key in (curses.KEY_DOWN,):
+                if item_positions:
+                    selection_idx = (selection_idx + 1) % len(item_positions)
+                continue
+            if key == curses.KEY_PPAGE:
+                if item_positions:
+                    selection_idx = max(0, selection_idx - 5)
+                continue
+            if key == curses.KEY_NPAGE:
+                if item_positions:
+                    selection_idx = min(len(item_positions) - 1, selection_idx + 5)
+                continue
+            if key == curses.KEY_DC:
+                if matches:
+                    history.remove(matches[selection_idx])
+                    kept = selection_idx
+                    refresh(query)
+                    selection_idx = kept
+                continue
+            if key in (curses.KEY_BACKSPACE,):
+                refresh(query[:-1])
+                continue
+
+
 def main(args: Iterable[str]) -> None:
+    if "--history" in list(args)[1:]:
+        with ClipboardHistory.from_env() as history:
+            curses.wrapper(run_history_palette, history)
+        return
     curses.wrapper(run_palette)
 
 
 def handle_result(*args, **kwargs):  # pragma: no cover - required entry point
     """Compatibility shim for kitty's kitten loader."""
     return None
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -27,6 +27,7 @@ SCRIPTS=(
     "scripts/switch-theme.sh"
     "scripts/show-shortcuts.sh"
     "scripts/tmux-shared-aliases.sh"
+    "scripts/test-clipboard-history.sh"
 )
 
 # Colors
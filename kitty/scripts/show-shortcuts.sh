@@ -97,6 +97,7 @@ show_shortcuts() {
   Ctrl+Shift+Alt+C           Copy and clear / send interrupt
   Ctrl+Shift+P               Paste without newlines
   Ctrl+Shift+Alt+P           Clipboard manager overlay
+  Ctrl+Shift+Alt+Y           Clipboard history (fuzzy recall)
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 🛠️ UTILITIES
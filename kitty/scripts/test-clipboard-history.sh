@@ -0,0 +1,331 @@
+#!/usr/bin/env bash
+# ═══════════════════════════════════════════════════════════
+# Clipboard History Store Test
+# ═══════════════════════════════════════════════════════════
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/lib/colors.sh"
+
+HISTORY_DIR="${SCRIPT_DIR}/../kittens/shortcuts_menu"
+HISTORY_PY="${HISTORY_DIR}/clipboard_history.py"
+TEST_DIR=$(mktemp -d)
+trap 'rm -rf "$TEST_DIR"' EXIT
+
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/history.bin"
+export KITTY_CLIPBOARD_HISTORY_MAX_ENTRIES=3
+export KITTY_CLIPBOARD_HISTORY_MAX_BYTES=4096
+
+history_cmd() {
+    python3 "$HISTORY_PY" "$@"
+}
+
+entry_count() {
+    history_cmd stats | awk '/^Entries:/ {print $2}'
+}
+
+# Run a Python snippet against the store module; it must exit 0 to pass
+history_py() {
+    PYTHONPATH="$HISTORY_DIR" python3 -c "$1"
+}
+
+echo "Testing clipboard history store..."
+echo ""
+
+# Test 1: Repeated copies are stored once
+echo "Test 1: Deduplication"
+printf 'git status' | history_cmd add
+printf 'git status' | history_cmd add
+if [[ "$(entry_count)" == "1" ]]; then
+    success_color "✅ Duplicate copy stored once"
+else
+    error_color "❌ Expected 1 entry, got $(entry_count)"
+    exit 1
+fi
+
+# Test 2: Oldest entry is evicted past the entry limit
+echo ""
+echo "Test 2: LRU eviction"
+printf 'ls -la' | history_cmd add
+printf 'make lint' | history_cmd add
+printf 'git status' | history_cmd add   # bump to most recent
+printf 'echo evict' | history_cmd add
+if history_cmd search | grep -q 'ls -la'; then
+    error_color "❌ Least recently used entry was not evicted"
+    exit 1
+elif [[ "$(entry_count)" == "3" ]] && history_cmd search | grep -q 'git status'; then
+    success_color "✅ Least recently used entry evicted"
+else
+    error_color "❌ Unexpected history after eviction"
+    exit 1
+fi
+
+# Test 3: Fuzzy recall matches in-order subsequences
+echo ""
+echo "Test 3: Fuzzy recall"
+if history_cmd search gtst | grep -q 'git status'; then
+    success_color "✅ Fuzzy query matched"
+else
+    error_color "❌ Fuzzy query did not match"
+    exit 1
+fi
+
+# Test 4: History survives reopen and can be cleared
+echo ""
+echo "Test 4: Persistence and clear"
+if [[ "$(history_cmd search | wc -l)" -eq 3 ]]; then
+    success_color "✅ Entries persisted across processes"
+else
+    error_color "❌ Entries not persisted"
+    exit 1
+fi
+history_cmd clear
+if [[ "$(entry_count)" == "0" ]]; then
+    success_color "✅ History cleared"
+else
+    error_color "❌ History not cleared"
+    exit 1
+fi
+
+# Test 5: Stats on a missing store does not create it
+echo ""
+echo "Test 5: Stats without a store"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/missing/history.bin"
+if history_cmd stats | grep -q 'empty' && [[ ! -e "${TEST_DIR}/missing" ]]; then
+    success_color "✅ Stats reported empty history without creating files"
+else
+    error_color "❌ Stats created the store or misreported it"
+    exit 1
+fi
+
+# Test 6: Byte-cap eviction
+echo ""
+echo "Test 6: Byte-cap eviction"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/bytes.bin"
+export KITTY_CLIPBOARD_HISTORY_MAX_ENTRIES=100
+export KITTY_CLIPBOARD_HISTORY_MAX_BYTES=64
+printf 'a%.0s' {1..30} | history_cmd add
+printf 'b%.0s' {1..30} | history_cmd add
+printf 'c%.0s' {1..30} | history_cmd add
+if [[ "$(entry_count)" == "2" ]] && ! history_cmd search aaa | grep -q aaa; then
+    success_color "✅ Oldest entry evicted past the byte limit"
+else
+    error_color "❌ Byte limit not enforced"
+    exit 1
+fi
+if ! printf 'd%.0s' {1..65} | history_cmd add; then
+    success_color "✅ Entry larger than the byte limit rejected"
+else
+    error_color "❌ Oversized entry accepted"
+    exit 1
+fi
+
+# Test 7: Compaction keeps entries and offsets valid
+echo ""
+echo "Test 7: Log compaction"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/compact.bin"
+if history_py '
+import os
+from clipboard_history import ClipboardHistory
+path = os.environ["KITTY_CLIPBOARD_HISTORY_FILE"]
+h = ClipboardHistory(path, max_entries=4, max_bytes=64)
+inode = os.stat(path).st_ino
+for i in range(50):
+    h.add(b"entry-%d" % i)
+assert os.stat(path).st_ino != inode, "log was never compacted"
+expected = ["entry-49", "entry-48", "entry-47", "entry-46"]
+assert [e.preview for e in h.search("")] == expected
+assert h.recall(h.search("47")[0]) == "entry-47"
+reopened = ClipboardHistory(path, max_entries=4, max_bytes=64)
+assert [e.preview for e in reopened.search("")] == ["entry-47", "entry-49", "entry-48", "entry-46"]
+'; then
+    success_color "✅ Compaction swapped the log and kept entries readable"
+else
+    error_color "❌ Compaction lost or corrupted entries"
+    exit 1
+fi
+
+# Test 8: Removals are replayed by other instances
+echo ""
+echo "Test 8: Remove and replay"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/remove.bin"
+if history_py '
+import os
+from clipboard_history import ClipboardHistory
+path = os.environ["KITTY_CLIPBOARD_HISTORY_FILE"]
+h = ClipboardHistory(path)
+h.add(b"keep me")
+h.add(b"drop me")
+h.remove(h.search("drop")[0])
+assert [e.preview for e in ClipboardHistory(path).search("")] == ["keep me"]
+'; then
+    success_color "✅ Removed entry stays gone after reopen"
+else
+    error_color "❌ Removed entry came back"
+    exit 1
+fi
+
+# Test 9: Narrowed queries match a cold search
+echo ""
+echo "Test 9: Incremental search cache"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/cache.bin"
+if history_py '
+import os
+from clipboard_history import ClipboardHistory
+path = os.environ["KITTY_CLIPBOARD_HISTORY_FILE"]
+h = ClipboardHistory(path)
+for text in ("git status", "git stash pop", "grep -rn todo", "go test ./...", "ls"):
+    h.add(text.encode())
+query = "git st p"
+for end in range(1, len(query) + 1):
+    typed = [e.preview for e in h.search(query[:end])]
+    cold = [e.preview for e in ClipboardHistory(path).search(query[:end])]
+    assert typed == cold, (query[:end], typed, cold)
+# Equal gaps tie-break newest first; the wider "go test" match ranks last
+assert [e.preview for e in h.search("gtst")] == ["git stash pop", "git status", "go test ./..."]
+'; then
+    success_color "✅ Cached narrowing matches cold results"
+else
+    error_color "❌ Cached narrowing diverged from cold search"
+    exit 1
+fi
+
+# Test 10: Torn tail is dropped without losing earlier entries
+echo ""
+echo "Test 10: Torn tail recovery"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/torn.bin"
+if history_py '
+import os, struct
+from clipboard_history import ClipboardHistory, _HEADER
+path = os.environ["KITTY_CLIPBOARD_HISTORY_FILE"]
+h = ClipboardHistory(path)
+h.add(b"intact")
+magic, version, generation, end = _HEADER.unpack_from(h._mm, 0)
+h._mm[end:end + 8] = b"\xff" * 8
+_HEADER.pack_into(h._mm, 0, magic, version, generation, end + 8)
+h.close()
+recovered = ClipboardHistory(path)
+assert [e.preview for e in recovered.search("")] == ["intact"]
+recovered.add(b"after")
+assert [e.preview for e in ClipboardHistory(path).search("")] == ["after", "intact"]
+'; then
+    success_color "✅ Torn tail discarded, log still appendable"
+else
+    error_color "❌ Torn tail broke the log"
+    exit 1
+fi
+
+# Test 11: Two instances sharing one store
+echo ""
+echo "Test 11: Concurrent instances"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/shared.bin"
+if history_py '
+import os
+from clipboard_history import ClipboardHistory
+path = os.environ["KITTY_CLIPBOARD_HISTORY_FILE"]
+a = ClipboardHistory(path)
+b = ClipboardHistory(path)
+a.add(b"original secret")
+stale = a.search("original")[0]
+b.clear()
+b.add(b"X" * 40)
+assert a.recall(stale) is None, "recall returned overwritten content"
+assert [e.preview for e in a.search("")] == ["X" * 40]
+b.add(b"from b")
+assert a.search("from b")[0].preview == "from b"
+assert a.recall(a.search("from b")[0]) == "from b"
+'; then
+    success_color "✅ Stale entries rejected, new entries visible"
+else
+    error_color "❌ Instances disagreed about the shared store"
+    exit 1
+fi
+
+# Test 12: Removed, evicted and cleared text is zeroed on disk
+echo ""
+echo "Test 12: Secrets erased from disk"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/erase.bin"
+export KITTY_CLIPBOARD_HISTORY_MAX_ENTRIES=2
+export KITTY_CLIPBOARD_HISTORY_MAX_BYTES=4096
+printf 'hunter2 removed' | history_cmd add
+history_py '
+import os
+from clipboard_history import ClipboardHistory
+h = ClipboardHistory(os.environ["KITTY_CLIPBOARD_HISTORY_FILE"])
+h.recall(h.search("hunter2")[0])
+h.remove(h.search("hunter2")[0])
+'
+if grep -q hunter2 "$KITTY_CLIPBOARD_HISTORY_FILE"; then
+    error_color "❌ Removed entry still readable in the store file"
+    exit 1
+fi
+printf 'hunter3 evicted' | history_cmd add
+printf 'filler one' | history_cmd add
+printf 'filler two' | history_cmd add
+if grep -q hunter3 "$KITTY_CLIPBOARD_HISTORY_FILE"; then
+    error_color "❌ Evicted entry still readable in the store file"
+    exit 1
+fi
+printf 'hunter4 cleared' | history_cmd add
+history_cmd clear
+if grep -q -e hunter4 -e filler "$KITTY_CLIPBOARD_HISTORY_FILE"; then
+    error_color "❌ Cleared entries still readable in the store file"
+    exit 1
+fi
+success_color "✅ Removed, evicted and cleared entries zeroed on disk"
+
+# Test 13: Binary data is rejected and previews are printable
+echo ""
+echo "Test 13: Input validation"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/validate.bin"
+if printf 'a\0b' | history_cmd add || printf '\xff\xfe' | history_cmd add; then
+    error_color "❌ NUL or non-UTF-8 data accepted"
+    exit 1
+fi
+if history_py '
+import os
+from clipboard_history import ClipboardHistory
+h = ClipboardHistory(os.environ["KITTY_CLIPBOARD_HISTORY_FILE"])
+h.add(b"tab\there \x1b[31mred\x07\r\n")
+preview = h.search("red")[0].preview
+assert preview.isprintable(), repr(preview)
+'; then
+    success_color "✅ Binary data rejected, control characters stripped from previews"
+else
+    error_color "❌ Preview kept control characters"
+    exit 1
+fi
+
+# Test 14: Recall stays under 10 ms with thousands of entries
+echo ""
+echo "Test 14: Search latency"
+export KITTY_CLIPBOARD_HISTORY_FILE="${TEST_DIR}/latency.bin"
+if history_py '
+import os, random, string, time
+from clipboard_history import ClipboardHistory
+rng = random.Random(0)
+alphabet = string.ascii_letters + string.digits + string.punctuation + " " * 10
+h = ClipboardHistory(os.environ["KITTY_CLIPBOARD_HISTORY_FILE"],
+                     max_entries=5000, max_bytes=16 * 1024 * 1024)
+for _ in range(5000):
+    h.add("".join(rng.choices(alphabet, k=rng.randint(20, 3000))).encode())
+h.search("")
+for query in ("qwerty", "git status", "x"):
+    timings = []
+    for _ in range(5):
+        h._last_query = ""
+        start = time.perf_counter()
+        h.search(query)
+        timings.append(time.perf_counter() - start)
+    median = sorted(timings)[2] * 1000
+    assert median < 10, "%r took %.1f ms" % (query, median)
+'; then
+    success_color "✅ Cold search over 5000 entries under 10 ms"
+else
+    error_color "❌ Search too slow"
+    exit 1
+fi
+
+echo ""
+success_color "✅ All 14 clipboard history tests passed!"